@@ -1,5 +1,6 @@
 # waqi_collect_until_10k.py
 import os, time, requests, pandas as pd
+from station_cache import LatestReadings, CACHE_FILE
 
 WAQI_TOKEN = os.getenv("WAQI_TOKEN", "ac3baf8cb4ba2298d3bd1a0cc9bdd4057cf6fafc")
 OUT_CSV = "waqi_global_dataset_timeseries.csv"
@@ -88,6 +89,7 @@ def main():
     stations = list_stations()
     total = len(load_existing())
     print(f"Starting with {total} rows in {OUT_CSV} (if any)")
+    latest = LatestReadings.load(CACHE_FILE, writable=True)
 
     round_idx = 0
     while total < TARGET_RECORDS:
@@ -105,6 +107,8 @@ def main():
             print("No rows fetched this round.")
         df_new = pd.DataFrame(rows)
         total = save_append(df_new)
+        latest.update(rows)
+        latest.save(CACHE_FILE)
         print(f"Round {round_idx}: added {len(df_new)} rows. Total now: {total}")
 
         if total >= TARGET_RECORDS:
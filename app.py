@@ -10,6 +10,9 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
 import datetime, io
+from aqi import compute_aqi, aqi_category
+from station_cache import LatestReadings, CACHE_FILE, latest_path
+from model_compare import list_challengers, load_models, score_models, agreement_matrix
 
 
 
@@ -25,6 +28,23 @@ model = joblib.load("aqi_predictor_with_pm.pkl")
 le = joblib.load("label_encoder.pkl")
 
 
+CHAMPION_KEY = "champion"
+
+
+@st.cache_resource
+def load_challengers(paths):
+    return load_models(paths)
+
+
+# Latest Station Readings (memory-mapped, written by DataSet.py)
+
+@st.cache_resource(max_entries=1)
+def load_latest(path):
+    # One entry: a newer generation evicts (and unmaps) the previous one,
+    # which the collector then deletes on its next round.
+    return LatestReadings.load(path)
+
+
 # User Database Setup
 
 USER_FILE = "users.csv"
@@ -222,7 +242,7 @@ else:
     st.title("🌍 Air Quality Index (AQI) Prediction Dashboard")
     st.markdown("This tool predicts **AQI Category** based on pollutant and weather measurements.")
 
-    tab1, tab2 = st.tabs(["⚡ Single Prediction", "📂 Batch Prediction"])
+    tab1, tab2, tab3 = st.tabs(["⚡ Single Prediction", "📂 Batch Prediction", "🛰️ Live Conditions"])
 
     
     # SINGLE PREDICTION
@@ -246,8 +266,10 @@ else:
             category = le.inverse_transform(pred)[0]
             cat_range = AQI_RANGES.get(category, (0,0))
 
-            # --- AQI Value (simple weighted calculation) ---
-            aqi_value = int(sum([pm25*0.4, pm10*0.3, no2*0.15, co*0.1, temp_c*0.05]))
+            # --- AQI Value (US EPA breakpoint tables) ---
+            aqi_value = int(compute_aqi(X_new)[0])
+            aqi_value_category = aqi_category([aqi_value])[0]
+            aqi_value_range = AQI_RANGES.get(aqi_value_category, (0,0))
 
             # After prediction, replace the display code with this:
 
@@ -277,7 +299,7 @@ else:
             
 
             st.markdown(f"### {sign} Predicted Category: **{category}**")
-            st.markdown(f"**Predicted AQI Value: {aqi_value}**")
+            st.markdown(f"**Computed AQI Value (US EPA): {aqi_value}**")
             st.markdown(f"**AQI Range for {category}: {cat_range[0]} – {cat_range[1]}**")
 
             st.markdown(
@@ -290,10 +312,13 @@ else:
                     font-size:16px;
                     color:#1a1a1a;
                 ">
-                <b>Explanation:</b> This means the air quality is classified as 
+                <b>Explanation:</b> The model classifies the air quality as 
                 <span style="color:#d9534f;"><b>{category}</b></span>.  
-                An AQI of <b>{aqi_value}</b> falls into the range <b>{cat_range[0]}–{cat_range[1]}</b>,  
-                which justifies the prediction. Health risks depend on pollutant exposure,  
+                The US EPA AQI computed from the entered concentrations is <b>{aqi_value}</b>,  
+                which falls in the <b>{aqi_value_category}</b> range <b>{aqi_value_range[0]}–{aqi_value_range[1]}</b>.  
+                {"Both agree on the category." if aqi_value_category == category else
+                 "The two differ: the model also weighs location and temperature, while the index uses the pollutant concentrations only."}  
+                Health risks depend on pollutant exposure,  
                 and sensitive groups may experience more serious effects.
                 </div>
                 """,
@@ -602,6 +627,7 @@ else:
 
             results = data.copy()
             results["Predicted_AQI_Category"] = categories
+            results["AQI_Value"] = pd.Series(compute_aqi(data), index=data.index).round().astype("Int64")
             results["Explanation"] = results["Predicted_AQI_Category"].apply(
                 lambda c: f"AQI falls in {c} range {AQI_RANGES.get(c,(0,0))}"
             )
@@ -627,4 +653,86 @@ else:
                 data=pdf_buffer,
                 file_name="aqi_batch_report.pdf",
                 mime="application/pdf"
-            )
\ No newline at end of file
+            )
+
+            # Champion / Challenger Comparison
+            st.markdown("### 🏁 Champion vs Challenger Models")
+            challenger_paths = list_challengers()
+            if not challenger_paths:
+                st.info("Save candidate model artifacts (*.pkl) in the `models/` folder to compare them here.")
+            else:
+                selected = st.multiselect("Challenger models", challenger_paths, default=challenger_paths)
+                if selected:
+                    challengers, load_errors = load_challengers(tuple(selected))
+                    challengers = dict(challengers)
+                    if CHAMPION_KEY in challengers:
+                        del challengers[CHAMPION_KEY]
+                        load_errors = {**load_errors, CHAMPION_KEY + " (models/)":
+                                       f"rejected: '{CHAMPION_KEY}' is reserved for the deployed model, rename the file"}
+                    models = {CHAMPION_KEY: model, **challengers}
+                    model_preds, model_stats = score_models(models, data, champion=CHAMPION_KEY,
+                                                            classes=le.classes_, errors=load_errors)
+                    failed = model_stats[model_stats["error"] != ""]
+                    for _, row in failed.iterrows():
+                        st.warning(f"⚠️ {row['model']}: {row['error']}")
+
+                    st.dataframe(model_stats)
+                    st.markdown(
+                        f"Scored **{len(data)} rows** with **{len(model_preds.columns)} models** concurrently "
+                        f"in **{model_stats.attrs['wall_s']:.3f}s** (wall time). Solo columns time each model on its own."
+                    )
+                    st.markdown("#### Pairwise Agreement")
+                    st.dataframe(agreement_matrix(model_preds).round(3))
+
+                    comparison = data.copy()
+                    for name in model_preds.columns:
+                        comparison[f"{name}_category"] = model_preds[name]
+                    st.download_button(
+                        "📥 Download Model Comparison CSV",
+                        comparison.to_csv(index=False),
+                        "aqi_model_comparison.csv",
+                        "text/csv"
+                    )
+
+
+    # LIVE CONDITIONS
+
+    with tab3:
+        st.subheader("🛰️ Latest Station Readings")
+        cache_path = latest_path(CACHE_FILE)
+        if cache_path is None:
+            st.info(f"No live readings yet — run DataSet.py to create {CACHE_FILE}.")
+        else:
+            latest = load_latest(cache_path)
+            st.markdown(f"**{len(latest)} stations** in the latest collection round.")
+
+            st.markdown("### 📍 Current Conditions Near Me")
+            c1, c2, c3 = st.columns(3)
+            near_lat = c1.number_input("Latitude", -90.0, 90.0, lat, key="near_lat")
+            near_lon = c2.number_input("Longitude", -180.0, 180.0, lon, key="near_lon")
+            near_k = c3.number_input("Stations", 1, 50, 5, key="near_k")
+            nearby = latest.nearest(near_lat, near_lon, k=int(near_k))
+            if not nearby.empty:
+                nearby["aqi_category"] = aqi_category(nearby["aqi"])
+            st.dataframe(nearby)
+
+            st.markdown("### 🌍 Network-wide AQI")
+            layer_df = latest.layer_frame("aqi")
+            palette = {
+                "Good": [40, 167, 69], "Moderate": [255, 193, 7], "Unhealthy for Sensitive": [253, 126, 20],
+                "Unhealthy": [220, 53, 69], "Very Unhealthy": [111, 66, 193], "Hazardous": [126, 0, 35],
+                "Unknown": [108, 117, 125],
+            }
+            layer_df["color"] = [palette[c] for c in aqi_category(layer_df["value"])]
+            layer = pdk.Layer(
+                "ScatterplotLayer", data=layer_df,
+                get_position='[lon, lat]',
+                get_fill_color='color',
+                get_radius=30000,
+                pickable=True
+            )
+            view_state = pdk.ViewState(latitude=near_lat, longitude=near_lon, zoom=2, pitch=0)
+            st.pydeck_chart(
+                pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip={"text": "Station {uid}: AQI {value}"}),
+                use_container_width=True
+            )
@@ -0,0 +1,172 @@
+# aqi.py
+# Piecewise-linear AQI from pollutant concentrations, vectorized over whole columns.
+import numpy as np
+import pandas as pd
+
+# Pollutants collected by DataSet.py
+POLLUTANTS = ["pm25", "pm10", "no2", "so2", "co", "o3"]
+
+# Concentrations are expected in the dashboard's units: µg/m³ for everything
+# except CO, which is mg/m³. FACTORS convert them into each table's native unit
+# (ppb / ppm at 25 °C, 1 atm), DIGITS is the truncation the standard applies
+# before the table lookup.
+STANDARDS = {}
+
+
+def register_standard(name, breakpoints, categories, factors=None, digits=None):
+    """Add a breakpoint table. `breakpoints` maps pollutant -> [(c_lo, c_hi, i_lo, i_hi), ...]
+    in ascending order; `categories` is [(i_hi, name), ...] for the overall index."""
+    tables = {}
+    for pollutant, rows in breakpoints.items():
+        arr = np.asarray(rows, dtype=np.float64)
+        if arr.ndim != 2 or arr.shape[1] != 4 or np.any(np.diff(arr[:, 1]) <= 0):
+            raise ValueError(f"{name}/{pollutant}: breakpoints must be ascending (c_lo, c_hi, i_lo, i_hi) rows")
+        c_lo, c_hi, i_lo, i_hi = (arr[:, k].copy() for k in range(4))
+        tables[pollutant] = (c_lo, c_hi, i_lo, (i_hi - i_lo) / (c_hi - c_lo))
+    STANDARDS[name] = {
+        "breakpoints": tables,
+        "factors": dict(factors or {}),
+        "digits": dict(digits or {}),
+        "category_bounds": np.asarray([hi for hi, _ in categories], dtype=np.float64),
+        "category_names": np.asarray([c for _, c in categories] + ["Unknown"], dtype=object),
+    }
+
+
+# US EPA (PM2.5 table as revised in 2024). O3 uses the 8-hour table, so its
+# sub-index tops out at 300; anything above a table's last breakpoint is capped.
+register_standard(
+    "US_EPA",
+    breakpoints={
+        "pm25": [(0.0, 9.0, 0, 50), (9.1, 35.4, 51, 100), (35.5, 55.4, 101, 150),
+                 (55.5, 125.4, 151, 200), (125.5, 225.4, 201, 300), (225.5, 325.4, 301, 500)],
+        "pm10": [(0, 54, 0, 50), (55, 154, 51, 100), (155, 254, 101, 150),
+                 (255, 354, 151, 200), (355, 424, 201, 300), (425, 604, 301, 500)],
+        "no2": [(0, 53, 0, 50), (54, 100, 51, 100), (101, 360, 101, 150),
+                (361, 649, 151, 200), (650, 1249, 201, 300), (1250, 2049, 301, 500)],
+        "so2": [(0, 35, 0, 50), (36, 75, 51, 100), (76, 185, 101, 150),
+                (186, 304, 151, 200), (305, 604, 201, 300), (605, 1004, 301, 500)],
+        "co": [(0.0, 4.4, 0, 50), (4.5, 9.4, 51, 100), (9.5, 12.4, 101, 150),
+               (12.5, 15.4, 151, 200), (15.5, 30.4, 201, 300), (30.5, 50.4, 301, 500)],
+        "o3": [(0, 54, 0, 50), (55, 70, 51, 100), (71, 85, 101, 150),
+               (86, 105, 151, 200), (106, 200, 201, 300)],
+    },
+    categories=[(50, "Good"), (100, "Moderate"), (150, "Unhealthy for Sensitive"),
+                (200, "Unhealthy"), (300, "Very Unhealthy"), (500, "Hazardous")],
+    factors={"no2": 24.45 / 46.01, "so2": 24.45 / 64.07, "o3": 24.45 / 48.00, "co": 24.45 / 28.01},
+    digits={"pm25": 1, "pm10": 0, "no2": 0, "so2": 0, "co": 1, "o3": 0},
+)
+
+# India National AQI (CPCB). Tables are already in µg/m³ (CO mg/m³); the open
+# "Severe" band is closed at a conventional ceiling.
+register_standard(
+    "IN_NAQI",
+    breakpoints={
+        "pm25": [(0, 30, 0, 50), (31, 60, 51, 100), (61, 90, 101, 200),
+                 (91, 120, 201, 300), (121, 250, 301, 400), (251, 380, 401, 500)],
+        "pm10": [(0, 50, 0, 50), (51, 100, 51, 100), (101, 250, 101, 200),
+                 (251, 350, 201, 300), (351, 430, 301, 400), (431, 600, 401, 500)],
+        "no2": [(0, 40, 0, 50), (41, 80, 51, 100), (81, 180, 101, 200),
+                (181, 280, 201, 300), (281, 400, 301, 400), (401, 800, 401, 500)],
+        "so2": [(0, 40, 0, 50), (41, 80, 51, 100), (81, 380, 101, 200),
+                (381, 800, 201, 300), (801, 1600, 301, 400), (1601, 2100, 401, 500)],
+        "co": [(0.0, 1.0, 0, 50), (1.1, 2.0, 51, 100), (2.1, 10, 101, 200),
+               (10.1, 17, 201, 300), (17.1, 34, 301, 400), (34.1, 50, 401, 500)],
+        "o3": [(0, 50, 0, 50), (51, 100, 51, 100), (101, 168, 101, 200),
+               (169, 208, 201, 300), (209, 748, 301, 400), (749, 1000, 401, 500)],
+    },
+    categories=[(50, "Good"), (100, "Satisfactory"), (200, "Moderate"),
+                (300, "Poor"), (400, "Very Poor"), (500, "Severe")],
+)
+
+
+def sub_index(values, pollutant, standard="US_EPA"):
+    """Sub-index for one pollutant over an array of concentrations. NaN and
+    negative concentrations give NaN."""
+    table = STANDARDS[standard]
+    c_lo, c_hi, i_lo, slope = table["breakpoints"][pollutant]
+    c = np.asarray(values, dtype=np.float64) * table["factors"].get(pollutant, 1.0)
+    digits = table["digits"].get(pollutant)
+    if digits is not None:
+        scale = 10.0 ** digits
+        c = np.floor(c * scale + 1e-6) / scale
+    invalid = ~(c >= 0)
+    c = np.minimum(np.where(invalid, 0.0, c), c_hi[-1])
+
+    idx = np.searchsorted(c_hi, c, side="left")
+    lo = c_lo[idx]
+    # Values falling in the gap between two bands (e.g. 9.05 for EPA PM2.5)
+    # are snapped to the start of the upper band.
+    out = np.maximum(c, lo, out=c)
+    out -= lo
+    out *= slope[idx]
+    out += i_lo[idx]
+    np.rint(out, out=out)
+    out[invalid] = np.nan
+    return out
+
+
+def sub_indices(data, standard="US_EPA"):
+    """DataFrame of sub-indices for every pollutant column present in `data`."""
+    table = STANDARDS[standard]["breakpoints"]
+    return pd.DataFrame(
+        {p: sub_index(data[p], p, standard) for p in POLLUTANTS if p in data and p in table},
+        index=data.index if isinstance(data, pd.DataFrame) else None,
+    )
+
+
+def overall_aqi(subs):
+    """Overall AQI = max of the available sub-indices per row (NaN if none)."""
+    arr = np.asarray(subs, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr
+    if arr.shape[1] == 0:
+        return np.full(arr.shape[0], np.nan)
+    return np.fmax.reduce(arr, axis=1)
+
+
+def compute_aqi(data, standard="US_EPA"):
+    """Overall AQI for every row of a DataFrame of concentrations."""
+    return overall_aqi(sub_indices(data, standard).to_numpy())
+
+
+def aqi_category(values, standard="US_EPA"):
+    """Category names for an array of AQI values ("Unknown" for NaN / out of range)."""
+    table = STANDARDS[standard]
+    v = np.asarray(values, dtype=np.float64)
+    idx = np.searchsorted(table["category_bounds"], np.where(v >= 0, v, np.inf), side="left")
+    return table["category_names"][idx]
+
+
+def check_reported(df, reported="aqi", tol=1):
+    """Compare the collected `aqi` field with the max of the per-pollutant values.
+    The WAQI feed reports pollutants as US EPA sub-indices already, so this
+    is the consistency check for DataSet.py output (no breakpoint lookup)."""
+    cols = [p for p in POLLUTANTS if p in df.columns]
+    expected = overall_aqi(df[cols].apply(pd.to_numeric, errors="coerce").to_numpy())
+    actual = pd.to_numeric(df[reported], errors="coerce").to_numpy()
+    both = ~np.isnan(expected) & ~np.isnan(actual)
+    diff = np.abs(expected - actual)
+    return {
+        "rows": len(df),
+        "compared": int(both.sum()),
+        "matching": int((diff[both] <= tol).sum()),
+        "mismatched_index": df.index[both][diff[both] > tol],
+    }
+
+
+if __name__ == "__main__":
+    import sys, time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "waqi_global_dataset_with_categoricals.csv"
+    df = pd.read_csv(path)
+    res = check_reported(df)
+    print(f"{path}: {res['matching']}/{res['compared']} rows match the reported aqi "
+          f"({res['rows']} rows total)")
+
+    n = 5_000_000
+    rng = np.random.default_rng(0)
+    bench = pd.DataFrame({p: rng.gamma(2.0, 20.0, n) for p in POLLUTANTS})
+    bench["co"] /= 20
+    t0 = time.perf_counter()
+    compute_aqi(bench)
+    print(f"US_EPA AQI for {n:,} rows in {time.perf_counter() - t0:.3f}s")
@@ -0,0 +1,280 @@
+# data_quality.py
+# Standalone data-quality stage for the collected WAQI history: vectorized rule
+# checks + hash-based dedup over chunked/streamed CSV input. Clean rows, a
+# quarantine file (with the failed rules) and a JSON summary report are written.
+import argparse, csv, io, itertools, json, os, sys, time
+import numpy as np
+import pandas as pd
+
+POLLUTANTS = ["pm25", "pm10", "no2", "so2", "co", "o3"]
+VALUE_COLUMNS = ["aqi"] + POLLUTANTS + ["temp_c", "humidity_pct", "pressure_hpa", "wind_speed_mps"]
+
+# Physically plausible ranges (inclusive); values outside are quarantined.
+# WAQI reports pollutants as sub-indices, so they share the 0-999 scale.
+VALID_RANGES = {
+    "aqi": (0, 999),
+    "pm25": (0, 999), "pm10": (0, 999), "no2": (0, 999),
+    "so2": (0, 999), "co": (0, 999), "o3": (0, 999),
+    "temp_c": (-90, 60),
+    "humidity_pct": (0, 100),
+    "pressure_hpa": (300, 1100),   # high-altitude stations sit well below 850 hPa
+    "wind_speed_mps": (0, 120),
+}
+
+DEDUP_KEY = ["uid", "time"]
+# A reading that repeats the station's previous one this many times in a row is treated as frozen.
+FROZEN_REPEATS = 3
+CHUNKSIZE = 200_000
+
+
+def _parse_chunk(df):
+    """Parse the columns the rules share once per chunk: `time` as datetime64
+    (NaT if missing/unparseable) and the value columns as float64."""
+    if "time" in df:
+        times = pd.to_datetime(df["time"], errors="coerce", format="ISO8601")
+    else:
+        times = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    # float64 throughout, so later hashes don't depend on whether a NaN in this
+    # chunk made pandas read a column as int64 or float64.
+    values = pd.DataFrame({c: pd.to_numeric(df[c], errors="coerce").astype("float64")
+                           for c in VALUE_COLUMNS if c in df}, index=df.index)
+    return times, values
+
+
+def rule_flags(df, times=None, values=None):
+    """Stateless row checks. Returns a DataFrame of boolean flags (True = failed).
+    `times` / `values` are the _parse_chunk results, parsed here if not given."""
+    if times is None or values is None:
+        times, values = _parse_chunk(df)
+    flags = {}
+    uid = pd.to_numeric(df["uid"], errors="coerce") if "uid" in df else pd.Series(np.nan, index=df.index)
+    flags["missing_uid"] = uid.isna().to_numpy()
+    flags["bad_time"] = times.isna().to_numpy()
+
+    if "lat" in df and "lon" in df:
+        lat = pd.to_numeric(df["lat"], errors="coerce").to_numpy(np.float64)
+        lon = pd.to_numeric(df["lon"], errors="coerce").to_numpy(np.float64)
+        flags["bad_coordinates"] = (
+            ~(np.abs(lat) <= 90) | ~(np.abs(lon) <= 180) | ((lat == 0) & (lon == 0))
+        )
+
+    neg = np.zeros(len(df), dtype=bool)
+    out_of_range = np.zeros(len(df), dtype=bool)
+    for c in values.columns:
+        v = values[c].to_numpy()
+        lo, hi = VALID_RANGES[c]
+        if c in POLLUTANTS or c == "aqi":
+            neg |= v < 0
+            out_of_range |= v > hi
+        else:
+            out_of_range |= (v < lo) | (v > hi)
+    flags["negative_concentration"] = neg
+    flags["out_of_range"] = out_of_range
+    return pd.DataFrame(flags, index=df.index)
+
+
+def _key_hash(df, cols, times):
+    """64-bit hash of the key columns that doesn't depend on the dtypes pandas
+    guessed for this chunk: `time` is hashed as its parsed int64 value, other
+    columns as float64 (int64 5 and float64 5.0 must hash alike). Rows with a
+    key value that isn't a number/timestamp are hashed on their text instead."""
+    num, text = {}, np.zeros(len(df), dtype=bool)
+    for c in cols:
+        if c == "time":
+            v = pd.Series(times.to_numpy("datetime64[ns]").view(np.int64), index=df.index)
+            text |= (times.isna() & df[c].notna()).to_numpy()
+        else:
+            v = pd.to_numeric(df[c], errors="coerce").astype("float64")
+            text |= (v.isna() & df[c].notna()).to_numpy()
+        num[c] = v
+    h = pd.util.hash_pandas_object(pd.DataFrame(num, index=df.index), index=False).to_numpy()
+    if text.any():
+        h = h.copy()
+        h[text] = pd.util.hash_pandas_object(df.loc[text, cols].astype(str), index=False,
+                                             hash_key="dq_text_key_0000").to_numpy()
+    return h
+
+
+class QualityPass:
+    """Stateful pass over a stream of chunks: keeps the dedup hashes and the
+    per-station frozen-value runs between chunks."""
+
+    def __init__(self, key=DEDUP_KEY, frozen_repeats=FROZEN_REPEATS):
+        self.key = key
+        self.frozen_repeats = frozen_repeats
+        self.seen = np.empty(0, dtype=np.uint64)   # sorted row hashes
+        self.last = {}                             # uid -> (value hash, repeat run)
+        self.counts = {}
+        self.rows_in = 0
+        self.rows_clean = 0
+
+    def _duplicates(self, df, times):
+        cols = self.key or list(df.columns)
+        missing = [c for c in cols if c not in df]
+        if missing:
+            raise KeyError(f"dedup key column(s) {missing} not in the input; pick others with --key")
+        h = _key_hash(df, cols, times)
+        dup = pd.Series(h).duplicated().to_numpy()
+        if len(self.seen):
+            pos = np.minimum(np.searchsorted(self.seen, h), len(self.seen) - 1)
+            dup = dup | (self.seen[pos] == h)
+        # h[~dup] is already unique; both inputs are sorted, so the stable
+        # (merge) sort keeps this linear.
+        new = np.sort(h[~dup])
+        self.seen = np.sort(np.concatenate([self.seen, new]), kind="stable")
+        return dup
+
+    def _frozen(self, df, eligible, times, vals):
+        if vals.empty or "uid" not in df or "time" not in df:
+            return np.zeros(len(df), dtype=bool)
+        # Rows with no values at all can't be frozen; neither can rejected ones.
+        eligible = eligible & vals.notna().any(axis=1).to_numpy()
+        pos = np.flatnonzero(eligible)
+        frozen = np.zeros(len(df), dtype=bool)
+        if len(pos) == 0:
+            return frozen
+
+        sub = pd.DataFrame({
+            "uid": pd.to_numeric(df["uid"], errors="coerce").to_numpy()[pos].astype(np.int64),
+            "time": times.to_numpy()[pos],
+            "h": pd.util.hash_pandas_object(vals.iloc[pos], index=False).to_numpy(),
+            "pos": pos,
+        }).sort_values(["uid", "time"], kind="stable")
+        uid, h = sub["uid"].to_numpy(), sub["h"].to_numpy()
+
+        first = np.ones(len(sub), dtype=bool)
+        first[1:] = uid[1:] != uid[:-1]
+        prev = np.empty_like(h)
+        prev[1:] = h[:-1]
+        carry = [self.last.get(u) for u in uid[first]]
+        known = np.array([c is not None for c in carry])
+        prev[first] = np.array([c[0] if c else 0 for c in carry], dtype=np.uint64)
+        same = h == prev
+        same[first] &= known
+
+        # Length of the current run of identical readings, continuing the run
+        # carried over from the previous chunk for each station.
+        seg = np.cumsum(~same | first)
+        run = pd.Series(same.astype(np.int64)).groupby(seg).cumsum().to_numpy()
+        start_run = np.zeros(len(sub), dtype=np.int64)
+        start_run[first] = np.where(same[first], [c[1] if c else 0 for c in carry], 0)
+        run = run + pd.Series(start_run).groupby(seg).transform("max").to_numpy()
+
+        frozen[sub["pos"].to_numpy()] = run >= self.frozen_repeats
+        last = np.append(first[1:], True)
+        self.last.update(zip(uid[last].tolist(), zip(h[last].tolist(), run[last].tolist())))
+        return frozen
+
+    def check(self, df):
+        """Run every rule on one chunk. Returns (bad row mask, `;`-joined reasons for the bad rows)."""
+        times, values = _parse_chunk(df)
+        flags = rule_flags(df, times, values)
+        flags["duplicate"] = self._duplicates(df, times)
+        bad = flags.any(axis=1).to_numpy()
+        flags["frozen_values"] = self._frozen(df, ~bad, times, values)
+        bad = bad | flags["frozen_values"].to_numpy()
+
+        self.rows_in += len(df)
+        self.rows_clean += int((~bad).sum())
+        for rule, n in flags.sum().items():
+            self.counts[rule] = self.counts.get(rule, 0) + int(n)
+
+        reasons = pd.Series("", index=df.index[bad])
+        for rule in flags.columns:
+            m = flags[rule].to_numpy()[bad]
+            reasons[m] = reasons[m] + rule + ";"
+        return bad, reasons.str.rstrip(";")
+
+    def process(self, df):
+        """Check one chunk. Returns (clean rows, quarantined rows with a `dq_reasons` column)."""
+        bad, reasons = self.check(df)
+        quarantined = df[bad].copy()
+        quarantined["dq_reasons"] = reasons
+        return df[~bad], quarantined
+
+    def summary(self):
+        return {
+            "rows_in": self.rows_in,
+            "rows_clean": self.rows_clean,
+            "rows_quarantined": self.rows_in - self.rows_clean,
+            "failed_rules": self.counts,
+        }
+
+
+def run(src, out, quarantine, report=None, chunksize=CHUNKSIZE, key=DEDUP_KEY):
+    """Stream `src` (path or text file object) through a QualityPass chunk by chunk.
+
+    Rows are copied to the output files as the original CSV lines rather than
+    re-serialized, which keeps the pass close to read speed. A chunk is extended
+    until its quotes balance, so a quoted field containing newlines is never
+    split between chunks; chunks whose lines don't map 1:1 to rows (blank lines,
+    quoted newlines) fall back to to_csv."""
+    t0 = time.perf_counter()
+    qp = QualityPass(key=key)
+    f = open(src, newline="") if isinstance(src, str) else src
+    try:
+        header = f.readline()
+        columns = next(csv.reader([header]), [])
+        missing = [c for c in (key or []) if c not in columns]
+        if missing:
+            raise ValueError(f"dedup key column(s) {', '.join(missing)} not in the input header; "
+                             f"pick others with --key (empty for the whole row)")
+        with open(out, "w", newline="") as fo, open(quarantine, "w", newline="") as fq:
+            fo.write(header)
+            fq.write(header.rstrip("\r\n") + ",dq_reasons\n")
+            while True:
+                lines = list(itertools.islice(f, chunksize))
+                if not lines:
+                    break
+                # An odd number of quotes means the last record continues on the
+                # next line (escaped quotes come in pairs and don't change parity).
+                text = "".join(lines)
+                quotes = text.count('"')
+                while quotes % 2:
+                    more = f.readline()
+                    if not more:
+                        break
+                    lines.append(more)
+                    text += more
+                    quotes += more.count('"')
+                chunk = pd.read_csv(io.StringIO(header + text), low_memory=False)
+                bad, reasons = qp.check(chunk)
+                if len(chunk) == len(lines):
+                    lines = np.asarray(lines, dtype=object)
+                    fo.write("".join(lines[~bad]))
+                    fq.writelines(l.rstrip("\r\n") + "," + r + "\n" for l, r in zip(lines[bad], reasons))
+                else:
+                    chunk[~bad].to_csv(fo, header=False, index=False)
+                    chunk[bad].assign(dq_reasons=reasons).to_csv(fq, header=False, index=False)
+    finally:
+        if f is not src:
+            f.close()
+
+    summary = qp.summary()
+    summary["seconds"] = round(time.perf_counter() - t0, 3)
+    if isinstance(src, str) and os.path.exists(src):
+        summary["mb_per_s"] = round(os.path.getsize(src) / 1e6 / max(summary["seconds"], 1e-9), 1)
+    if report:
+        with open(report, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Data-quality pass over collected WAQI readings.")
+    p.add_argument("input", help="CSV file, or - for stdin")
+    p.add_argument("--out", default="waqi_clean.csv")
+    p.add_argument("--quarantine", default="waqi_quarantine.csv")
+    p.add_argument("--report", default="waqi_quality_report.json")
+    p.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    p.add_argument("--key", default=",".join(DEDUP_KEY),
+                   help="comma-separated dedup columns; empty string = whole row")
+    args = p.parse_args()
+
+    key = [k for k in args.key.split(",") if k]
+    try:
+        summary = run(sys.stdin if args.input == "-" else args.input,
+                      args.out, args.quarantine, args.report, args.chunksize, key)
+    except ValueError as e:
+        p.error(str(e))
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,128 @@
+# model_compare.py
+# Champion/challenger scoring: run several model artifacts over the same batch
+# in parallel and report agreement, latency and throughput.
+import os, sys, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+
+CHAMPION_FILE = "aqi_predictor_with_pm.pkl"
+LABEL_ENCODER_FILE = "label_encoder.pkl"
+CHALLENGER_DIR = "models"
+
+
+def list_challengers(directory=CHALLENGER_DIR):
+    """Model artifacts (*.pkl) available for comparison."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".pkl"))
+
+
+def load_models(paths):
+    """Load each artifact path, named after the file. Returns ({name: model},
+    {name: error message}) so that one unreadable pickle (e.g. from another
+    sklearn version) doesn't stop the others from being compared."""
+    models, errors = {}, {}
+    for p in paths:
+        name = os.path.splitext(os.path.basename(p))[0]
+        try:
+            models[name] = joblib.load(p)
+        except Exception as e:
+            errors[name] = f"load failed: {type(e).__name__}: {e}"
+    return models, errors
+
+
+def _timed_predict(model, X):
+    t0 = time.perf_counter()
+    pred = np.asarray(model.predict(X))
+    return pred, time.perf_counter() - t0
+
+
+def to_labels(pred, classes=None):
+    """Class names for one model's predictions: integer codes are decoded with
+    `classes` (the label encoder's classes_), labels are kept as they are."""
+    pred = np.asarray(pred)
+    if classes is not None and np.issubdtype(pred.dtype, np.integer) and len(pred) \
+            and pred.min() >= 0 and pred.max() < len(classes):
+        return np.asarray(classes, dtype=object)[pred]
+    return pred.astype(object)
+
+
+def score_models(models, X, champion=None, classes=None, processes=False, max_workers=None, errors=None):
+    """Score `X` with every model concurrently, then time each model again on its own.
+
+    sklearn's predict spends most of its time in NumPy/BLAS code that releases the
+    GIL, so threads are the default; `processes=True` pickles each model to a worker
+    process instead. Returns (predictions DataFrame of class names, stats DataFrame).
+
+    Predictions are mapped to class names with `classes` before comparing, so a
+    model returning labels agrees with one returning encoded classes. Agreement
+    is measured against `champion` (default: the first model). In the stats,
+    `solo_*` columns time each model alone, `concurrent_latency_s` while all ran
+    together (stats.attrs["wall_s"] is that run's wall time). A model whose
+    predict raises gets no predictions column and its message in the `error`
+    column; `errors` ({name: message}, e.g. from load_models) adds further
+    failed rows."""
+    names = list(models)
+    if not names and not errors:
+        raise ValueError("No models to score.")
+    champion = champion or (names[0] if names else None)
+    pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    results, failed = {}, dict(errors or {})
+    t0 = time.perf_counter()
+    if names:
+        with pool_cls(max_workers=max_workers or len(names)) as pool:
+            futures = {name: pool.submit(_timed_predict, models[name], X) for name in names}
+            for name, f in futures.items():
+                try:
+                    results[name] = f.result()
+                except Exception as e:
+                    failed[name] = f"predict failed: {type(e).__name__}: {e}"
+    wall = time.perf_counter() - t0
+
+    # Concurrent latencies include contention for the CPU, so compare speed solo.
+    solo = {name: _timed_predict(models[name], X)[1] for name in names if name in results}
+
+    preds = pd.DataFrame({name: to_labels(results[name][0], classes) for name in names if name in results},
+                         index=X.index)
+    base = preds[champion].to_numpy() if champion in preds else None
+    rows = []
+    for name in names + [n for n in failed if n not in models]:
+        latency = solo.get(name, np.nan)
+        rows.append({
+            "model": name,
+            "role": "champion" if name == champion else "challenger",
+            "solo_latency_s": latency,
+            "solo_rows_per_s": len(X) / latency if latency > 0 else (np.inf if latency == 0 else np.nan),
+            "concurrent_latency_s": results[name][1] if name in results else np.nan,
+            "agreement_with_champion": float(np.mean(preds[name].to_numpy() == base))
+                                       if name in preds and base is not None and len(X) else np.nan,
+            "error": failed.get(name, ""),
+        })
+    stats = pd.DataFrame(rows)
+    stats.attrs["wall_s"] = wall
+    return preds, stats
+
+
+def agreement_matrix(preds):
+    """Pairwise share of rows on which two models predict the same class."""
+    arr = preds.to_numpy()
+    m = (arr[:, :, None] == arr[:, None, :]).mean(axis=0)
+    return pd.DataFrame(m, index=preds.columns, columns=preds.columns)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python model_compare.py <data.csv|xlsx> [model.pkl ...]")
+        sys.exit(1)
+    path = sys.argv[1]
+    data = pd.read_csv(path) if path.endswith(".csv") else pd.read_excel(path)
+    paths = sys.argv[2:] or [CHAMPION_FILE] + list_challengers()
+    models, errors = load_models(paths)
+    classes = joblib.load(LABEL_ENCODER_FILE).classes_ if os.path.exists(LABEL_ENCODER_FILE) else None
+    preds, stats = score_models(models, data, classes=classes, errors=errors)
+    print(stats.to_string(index=False))
+    print(f"Wall time (all models concurrently): {stats.attrs['wall_s']:.3f}s for {len(data)} rows")
+    print(agreement_matrix(preds).round(3).to_string())
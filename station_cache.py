@@ -0,0 +1,182 @@
+# station_cache.py
+# Latest reading per station as a compact structured NumPy array, persisted as
+# a .npy file that readers memory-map read-only (no CSV parsing, no copy).
+import glob, os
+import numpy as np
+import pandas as pd
+
+CACHE_FILE = "waqi_latest_readings.npy"
+
+FIELDS = ["aqi", "pm25", "pm10", "no2", "so2", "co", "o3",
+          "temp_c", "humidity_pct", "pressure_hpa", "wind_speed_mps"]
+
+READING_DTYPE = np.dtype(
+    [("uid", "i8"), ("time", "M8[s]"), ("lat", "f4"), ("lon", "f4")]
+    + [(f, "f4") for f in FIELDS]
+)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _generations(path):
+    """Saved generations of `path` (waqi_latest_readings.<seq>.npy), oldest first."""
+    stem, ext = os.path.splitext(path)
+    found = []
+    for p in glob.glob(f"{glob.escape(stem)}.*{ext}"):
+        seq = p[len(stem) + 1:-len(ext)]
+        if seq.isdigit():
+            found.append((int(seq), p))
+    return [p for _, p in sorted(found)]
+
+
+def latest_path(path=CACHE_FILE):
+    """The newest saved generation of `path`, or None if nothing was saved yet."""
+    gens = _generations(path)
+    return gens[-1] if gens else None
+
+
+class LatestReadings:
+    """Latest reading per station uid. Rows are updated in place; `index` maps uid -> row."""
+
+    def __init__(self, capacity=4096, data=None, n=None):
+        self.data = np.zeros(capacity, dtype=READING_DTYPE) if data is None else data
+        self.n = (0 if data is None else len(data)) if n is None else n
+        self.index = {int(u): i for i, u in enumerate(self.data["uid"][:self.n])}
+
+    @classmethod
+    def load(cls, path=CACHE_FILE, writable=False):
+        """Map the newest saved generation. Read-only maps share pages with the file (zero copy);
+        `writable=True` copies it into memory so the collector can keep updating it."""
+        # `path` is the base name (resolved to its newest generation) or a generation itself.
+        path = latest_path(path) or (path if os.path.exists(path) else None)
+        if path is None:
+            return cls()
+        arr = np.load(path, mmap_mode="r")
+        if arr.dtype != READING_DTYPE:
+            raise ValueError(f"{path}: unexpected dtype {arr.dtype}")
+        if not writable:
+            return cls(data=arr)
+        data = np.zeros(max(4096, 2 * len(arr)), dtype=READING_DTYPE)
+        data[:len(arr)] = arr
+        return cls(data=data, n=len(arr))
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def rows(self):
+        return self.data[:self.n]
+
+    def _grow(self, needed):
+        cap = len(self.data)
+        while cap < needed:
+            cap *= 2
+        data = np.zeros(cap, dtype=READING_DTYPE)
+        data[:self.n] = self.data[:self.n]
+        self.data = data
+
+    def update(self, readings):
+        """Upsert readings (list of DataSet.fetch_station rows or a DataFrame).
+        Older readings never overwrite a newer one. Returns the number of rows changed."""
+        df = pd.DataFrame(readings)
+        if df.empty or "uid" not in df.columns:
+            return 0
+        df = df.dropna(subset=["uid"])
+        if "time" in df.columns:
+            times = pd.to_datetime(df["time"], errors="coerce").to_numpy("M8[s]")
+        else:
+            times = np.full(len(df), np.datetime64("NaT"), "M8[s]")
+        # Oldest first, so that within one batch the newest reading is written last.
+        order = np.argsort(times, kind="stable")
+        df, times = df.iloc[order], times[order]
+        uids = df["uid"].astype("int64").to_numpy()
+
+        new = [u for u in dict.fromkeys(uids.tolist()) if u not in self.index]
+        if new:
+            if self.n + len(new) > len(self.data):
+                self._grow(self.n + len(new))
+            for u in new:
+                self.index[u] = self.n
+                self.data["uid"][self.n] = u
+                self.data["time"][self.n] = np.datetime64("NaT")
+                self.n += 1
+
+        pos = np.fromiter((self.index[u] for u in uids.tolist()), dtype=np.int64, count=len(uids))
+        current = self.data["time"][pos]
+        keep = np.isnat(current) | (times >= current)
+        # Several readings for one station in a batch: the last (newest) one wins.
+        pos, keep_idx = pos[keep], np.flatnonzero(keep)
+        if len(pos) == 0:
+            return 0
+
+        self.data["time"][pos] = times[keep_idx]
+        for col in ["lat", "lon"] + FIELDS:
+            if col in df.columns:
+                vals = pd.to_numeric(df[col], errors="coerce").to_numpy(np.float32)
+                self.data[col][pos] = vals[keep_idx]
+            else:
+                self.data[col][pos] = np.nan
+        return len(np.unique(pos))
+
+    def save(self, path=CACHE_FILE):
+        """Write the filled rows as a new generation (waqi_latest_readings.<seq>.npy)
+        and delete the older ones. Readers keep mapping whichever generation they
+        opened, so nothing is ever replaced under a live map (Windows refuses that);
+        a generation still mapped by a reader is left for a later round to delete.
+        Returns the path written."""
+        gens = _generations(path)
+        stem, ext = os.path.splitext(path)
+        seq = int(gens[-1][len(stem) + 1:-len(ext)]) + 1 if gens else 1
+        new = f"{stem}.{seq:010d}{ext}"
+        tmp = f"{path}.tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=READING_DTYPE, shape=(self.n,))
+        out[:] = self.rows
+        out.flush()
+        del out
+        # New name, so the rename never targets a file a reader has mapped.
+        os.replace(tmp, new)
+        for old in gens:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return new
+
+    def lookup(self, uids):
+        """Rows for the given uids (missing uids are skipped)."""
+        rows = [self.index[int(u)] for u in np.atleast_1d(uids) if int(u) in self.index]
+        return self.rows[rows]
+
+    def nearest(self, lat, lon, k=5, max_km=None):
+        """The k closest stations to (lat, lon) as a DataFrame with a `distance_km` column."""
+        rows = self.rows
+        ok = ~np.isnan(rows["lat"]) & ~np.isnan(rows["lon"])
+        rows = rows[ok]
+        if len(rows) == 0:
+            return pd.DataFrame(columns=list(READING_DTYPE.names) + ["distance_km"])
+        lat1, lon1 = np.radians(lat), np.radians(lon)
+        lat2 = np.radians(rows["lat"].astype(np.float64))
+        lon2 = np.radians(rows["lon"].astype(np.float64))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        k = min(k, len(rows))
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top])]
+        if max_km is not None:
+            top = top[dist[top] <= max_km]
+        df = pd.DataFrame(rows[top])
+        df["distance_km"] = dist[top]
+        return df
+
+    def layer_frame(self, field="aqi"):
+        """lat/lon/value columns for every station with a value, ready for a pydeck layer."""
+        rows = self.rows
+        vals = rows[field]
+        ok = ~np.isnan(vals) & ~np.isnan(rows["lat"]) & ~np.isnan(rows["lon"])
+        return pd.DataFrame({
+            "uid": rows["uid"][ok],
+            "lat": rows["lat"][ok],
+            "lon": rows["lon"][ok],
+            "value": vals[ok],
+        })
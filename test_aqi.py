@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqi import sub_index, compute_aqi, aqi_category
+
+
+@pytest.mark.parametrize("conc, expected", [
+    (0.0, 0), (9.0, 50), (9.05, 50), (9.1, 51), (35.4, 100),
+    (35.5, 101), (55.4, 150), (325.4, 500), (1000.0, 500),
+])
+def test_pm25_band_edges(conc, expected):
+    assert sub_index([conc], "pm25")[0] == expected
+
+
+def test_unit_conversion_and_truncation():
+    # 188.2 µg/m³ NO2 -> 100.0 ppb; 10.77 mg/m³ CO -> 9.40 ppm, truncated to 9.4
+    assert sub_index([188.2], "no2")[0] == 100
+    assert sub_index([10.77], "co")[0] == 100
+
+
+def test_nan_and_negative_give_nan():
+    out = sub_index([np.nan, -1.0, 12.0], "pm25")
+    assert np.isnan(out[:2]).all() and out[2] == 56
+
+
+def test_overall_is_max_of_available_subindices():
+    df = pd.DataFrame({"pm25": [12.0, np.nan], "pm10": [60.0, np.nan]})
+    out = compute_aqi(df)
+    assert out[0] == 56 and np.isnan(out[1])
+
+
+def test_category_bounds():
+    assert aqi_category([0, 50, 51, 100, 101, 500]).tolist() == [
+        "Good", "Good", "Moderate", "Moderate", "Unhealthy for Sensitive", "Hazardous"]
+    assert aqi_category([501])[0] == "Unknown"
+    assert aqi_category([np.nan])[0] == "Unknown"
+    assert aqi_category([75], "IN_NAQI")[0] == "Satisfactory"
@@ -0,0 +1,67 @@
+import json
+import pandas as pd
+import pytest
+
+from data_quality import run
+
+HEADER = "uid,time,lat,lon,pm25,pm10\n"
+
+
+def _run(tmp_path, body, chunksize):
+    src = tmp_path / "in.csv"
+    src.write_text(HEADER + body)
+    summary = run(str(src), str(tmp_path / "clean.csv"), str(tmp_path / "q.csv"),
+                  str(tmp_path / "report.json"), chunksize=chunksize)
+    assert json.loads((tmp_path / "report.json").read_text())["rows_in"] == summary["rows_in"]
+    return summary
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 10])
+def test_duplicate_found_across_chunks_with_missing_uid_between(tmp_path, chunksize):
+    body = ("5,2025-01-01 00:00:00,1,1,10,20\n"
+            "6,2025-01-01 00:00:00,1,1,11,21\n"
+            ",2025-01-01 00:00:00,1,1,12,22\n"
+            "5,2025-01-01 00:00:00,1,1,10,20\n")
+    summary = _run(tmp_path, body, chunksize)
+    assert summary["failed_rules"]["duplicate"] == 1
+    assert summary["failed_rules"]["missing_uid"] == 1
+    assert summary["rows_clean"] == 2
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 100])
+def test_frozen_run_independent_of_chunking(tmp_path, chunksize):
+    body = "".join(f"1,2025-01-01 0{h}:00:00,1,1,10,20\n" for h in range(6))
+    body += "2,2025-01-01 00:00:00,1,1,,\n"
+    summary = _run(tmp_path, body, chunksize)
+    assert summary["failed_rules"]["frozen_values"] == 3
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 10])
+def test_quoted_newline_across_chunk_boundary(tmp_path, chunksize):
+    src = tmp_path / "in.csv"
+    src.write_text('uid,time,city_name,pm25\n'
+                   '1,2025-01-01 00:00:00,x,5\n'
+                   '2,2025-01-01 00:00:00,"a\nb",6\n'
+                   '1,2025-01-01 00:00:00,x,5\n')
+    summary = run(str(src), str(tmp_path / "clean.csv"), str(tmp_path / "q.csv"), chunksize=chunksize)
+    assert summary["failed_rules"]["duplicate"] == 1
+    clean = pd.read_csv(tmp_path / "clean.csv")
+    assert clean["city_name"].tolist() == ["x", "a\nb"]
+
+
+def test_missing_key_column_names_the_option(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("pm25,pm10\n1,2\n")
+    with pytest.raises(ValueError, match="--key"):
+        run(str(src), str(tmp_path / "clean.csv"), str(tmp_path / "q.csv"))
+    assert run(str(src), str(tmp_path / "clean.csv"), str(tmp_path / "q.csv"), key=[])["rows_in"] == 1
+
+
+def test_unparseable_times_are_not_collapsed_into_duplicates(tmp_path):
+    body = ("1,not a time,1,1,10,20\n"
+            "1,also bad,1,1,10,20\n"
+            "1,2025-01-01T00:00:00,1,1,10,20\n"
+            "1,2025-01-01 00:00:00,1,1,10,20\n")
+    summary = _run(tmp_path, body, 2)
+    assert summary["failed_rules"]["bad_time"] == 2
+    assert summary["failed_rules"]["duplicate"] == 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from model_compare import score_models, agreement_matrix
+
+CLASSES = np.array(["Good", "Moderate"])
+
+
+class Threshold:
+    def __init__(self, labels=False):
+        self.labels = labels
+
+    def predict(self, X):
+        pred = (X["pm25"].to_numpy() > 50).astype(np.int64)
+        return CLASSES[pred] if self.labels else pred
+
+
+class Broken:
+    def predict(self, X):
+        raise ValueError("feature names should match")
+
+
+def test_label_and_code_predictions_agree_and_failures_are_reported():
+    X = pd.DataFrame({"pm25": np.arange(100.0)})
+    preds, stats = score_models({"champion": Threshold(), "labels": Threshold(labels=True), "broken": Broken()},
+                                X, champion="champion", classes=CLASSES, errors={"bad": "load failed"})
+    stats = stats.set_index("model")
+    assert stats.loc["labels", "agreement_with_champion"] == 1.0
+    assert preds["champion"].tolist() == preds["labels"].tolist()
+    assert agreement_matrix(preds).loc["champion", "labels"] == 1.0
+    assert "broken" not in preds and stats.loc["broken", "error"].startswith("predict failed")
+    assert stats.loc["bad", "error"] == "load failed"
+    assert stats.loc["champion", "solo_latency_s"] >= 0 and stats.attrs["wall_s"] >= 0
@@ -0,0 +1,49 @@
+import os
+import numpy as np
+
+from station_cache import LatestReadings, latest_path
+
+
+def test_update_newest_reading_wins():
+    cache = LatestReadings(capacity=2)
+    changed = cache.update([
+        {"uid": 7, "time": "2025-01-01 02:00:00", "aqi": 30},
+        {"uid": 7, "time": "2025-01-01 03:00:00", "aqi": 40},
+        {"uid": 7, "time": "2025-01-01 01:00:00", "aqi": 20},
+    ])
+    assert changed == 1 and len(cache) == 1
+    assert cache.lookup([7])["aqi"][0] == 40
+
+    assert cache.update([{"uid": 7, "time": "2025-01-01 00:00:00", "aqi": 10}]) == 0
+    assert cache.lookup([7])["aqi"][0] == 40
+
+    assert cache.update([{"uid": u, "time": "2025-01-01 04:00:00", "aqi": u} for u in (7, 8, 9)]) == 3
+    assert len(cache) == 3 and cache.lookup([9])["aqi"][0] == 9
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "latest.npy")
+    cache = LatestReadings()
+    cache.update([{"uid": 1, "time": "2025-01-01 00:00:00", "lat": 6.9, "lon": 79.8, "pm25": 12.5},
+                  {"uid": 2, "time": "2025-01-01 00:00:00", "lat": 7.0, "lon": 80.0}])
+    first = cache.save(path)
+
+    loaded = LatestReadings.load(path)
+    assert isinstance(loaded.data, np.memmap) and not loaded.data.flags.writeable
+    assert loaded.rows.tobytes() == cache.rows.tobytes()
+    assert loaded.index == {1: 0, 2: 1}
+    assert LatestReadings.load(first).index == loaded.index
+
+    writable = LatestReadings.load(path, writable=True)
+    writable.update([{"uid": 3, "time": "2025-01-01 01:00:00"}])
+    second = writable.save(path)
+    assert latest_path(path) == second and not os.path.exists(first)
+    assert len(LatestReadings.load(path)) == 3
+
+
+def test_save_load_empty(tmp_path):
+    path = str(tmp_path / "latest.npy")
+    assert len(LatestReadings.load(path)) == 0
+    LatestReadings().save(path)
+    loaded = LatestReadings.load(path)
+    assert len(loaded) == 0 and loaded.index == {}